@@ -8,17 +8,132 @@ st.set_page_config(layout='wide', page_title='Plotly Datasets Dashboard')
 st.title('Plotly Built-in Datasets Dashboard')
 
 # ===== STEP 1: LOAD & CACHE =====
+# Low-cardinality string columns are stored as category dtype: integer
+# codes instead of per-cell strings, so .isin/.unique/groupby run on
+# small int arrays and the cached frames shrink.
 @st.cache_data
 def load_tips():
-    return px.data.tips()
+    return px.data.tips().astype({'day': 'category', 'time': 'category',
+                                  'sex': 'category'})
 
 @st.cache_data
 def load_iris():
-    return px.data.iris()
+    return px.data.iris().astype({'species': 'category'})
 
 @st.cache_data
 def load_gapminder():
-    return px.data.gapminder()
+    return px.data.gapminder().astype({'continent': 'category'})
+
+# ===== CACHED DISTINCT VALUES =====
+# Widget options never change after load, so list the category levels
+# once instead of re-running unique() on every rerun.
+@st.cache_data
+def tips_distincts():
+    df = load_tips()
+    return {'day': df['day'].cat.categories.tolist(),
+            'sex': df['sex'].cat.categories.tolist()}
+
+@st.cache_data
+def iris_distincts():
+    df = load_iris()
+    return {'species': df['species'].cat.categories.tolist()}
+
+@st.cache_data
+def gapminder_distincts():
+    df = load_gapminder()
+    return {'continent': df['continent'].cat.categories.tolist(),
+            'year_range': (int(df['year'].min()), int(df['year'].max()))}
+
+# ===== CACHED FILTERS & METRICS =====
+# Keyed on the (hashable) filter widget values, so repeated widget
+# configurations reuse the memoized slice instead of refiltering.
+@st.cache_data
+def filter_tips(days, time, sex):
+    filtered = load_tips()
+    filtered = filtered[filtered['day'].isin(days)]
+    if time != 'All':
+        filtered = filtered[filtered['time'] == time]
+    if sex != 'All':
+        filtered = filtered[filtered['sex'] == sex]
+    return filtered
+
+@st.cache_data
+def filter_iris(species):
+    df = load_iris()
+    return df[df['species'].isin(species)]
+
+@st.cache_data
+def filter_gapminder(year, continents):
+    df = load_gapminder()
+    return df[(df['year'] == year) & (df['continent'].isin(continents))]
+
+# Metrics use a single fused .agg pass per dataset instead of one
+# reduction call per metric.
+@st.cache_data
+def tips_metrics(days, time, sex):
+    filtered = filter_tips(days, time, sex)
+    stats = filtered.agg({'total_bill': ['sum', 'mean'], 'tip': ['mean']})
+    return (stats.loc['sum', 'total_bill'], stats.loc['mean', 'tip'],
+            stats.loc['mean', 'total_bill'], len(filtered))
+
+@st.cache_data
+def iris_metrics(species):
+    filtered = filter_iris(species)
+    stats = filtered.agg({'species': 'nunique', 'petal_length': 'mean',
+                          'sepal_width': 'mean'})
+    return (len(filtered), int(stats['species']),
+            stats['petal_length'], stats['sepal_width'])
+
+@st.cache_data
+def gapminder_metrics(year, continents):
+    filtered = filter_gapminder(year, continents)
+    stats = filtered.agg({'country': 'nunique', 'lifeExp': 'mean',
+                          'gdpPercap': 'mean', 'pop': 'sum'})
+    return (int(stats['country']), stats['lifeExp'],
+            stats['gdpPercap'], stats['pop'])
+
+# Above this many rows a scatter gains nothing visually but pays for
+# every extra point in serialization and rendering.
+MAX_SCATTER_POINTS = 5000
+
+def downsample_for_plot(df, color_col):
+    """Downsample to ~MAX_SCATTER_POINTS rows, stratified by color group."""
+    if len(df) <= MAX_SCATTER_POINTS:
+        return df
+    frac = MAX_SCATTER_POINTS / len(df)
+    return df.groupby(color_col, observed=True).sample(frac=frac, random_state=0)
+
+# ===== CACHED FIGURES =====
+# Figure construction is the dominant rerun cost after filtering; keep
+# the built Figure objects alive per filter key. cache_resource hands
+# back the live object without a pickle round-trip, which is safe here
+# because the figures are render-only.
+@st.cache_resource
+def tips_figures(days, time, sex):
+    filtered = filter_tips(days, time, sex)
+    sampled = downsample_for_plot(filtered, 'time')
+    # render_mode='webgl' emits scattergl traces: GPU-rendered points
+    # instead of one SVG node per point.
+    scatter = px.scatter(sampled, x='total_bill', y='tip', color='time', size='size',
+                         render_mode='webgl')
+    box = px.box(filtered, x='day', y='total_bill', color='time')
+    return scatter, box
+
+@st.cache_resource
+def iris_figures(species):
+    filtered = filter_iris(species)
+    sampled = downsample_for_plot(filtered, 'species')
+    scatter = px.scatter(sampled, x='petal_length', y='petal_width', color='species', size='sepal_length',
+                         render_mode='webgl')
+    hist = px.histogram(filtered, x='sepal_length', nbins=30, color='species')
+    scatter_3d = px.scatter_3d(sampled, x='sepal_length', y='sepal_width', z='petal_length', color='species')
+    return scatter, hist, scatter_3d
+
+@st.cache_resource
+def gapminder_figure(year, continents):
+    filtered = downsample_for_plot(filter_gapminder(year, continents), 'continent')
+    return px.scatter(filtered, x='gdpPercap', y='lifeExp', size='pop', color='continent',
+                      hover_name='country', log_x=True, size_max=60)
 
 # ===== SIDEBAR NAVIGATION =====
 st.sidebar.header('Navigation')
@@ -33,35 +148,33 @@ if dataset == 'Tips':
     
     # STEP 2: Sidebar Filters
     st.sidebar.subheader('Filters')
-    selected_day = st.sidebar.multiselect('Day', df['day'].unique(),
-                                          default=df['day'].unique())
+    options = tips_distincts()
+    selected_day = st.sidebar.multiselect('Day', options['day'],
+                                          default=options['day'])
     selected_time = st.sidebar.selectbox('Time', ['All', 'Lunch', 'Dinner'])
-    selected_sex = st.sidebar.selectbox('Sex', ['All'] + df['sex'].unique().tolist())
-    
-    # STEP 3: Apply Filters
-    filtered = df[df['day'].isin(selected_day)]
-    if selected_time != 'All':
-        filtered = filtered[filtered['time'] == selected_time]
-    if selected_sex != 'All':
-        filtered = filtered[filtered['sex'] == selected_sex]
+    selected_sex = st.sidebar.selectbox('Sex', ['All'] + options['sex'])
     
+    # STEP 3: Apply Filters (cached on the widget values)
+    filter_key = (tuple(sorted(selected_day)), selected_time, selected_sex)
+    filtered = filter_tips(*filter_key)
+
     # STEP 4: Show Metrics
+    bill_sum, tip_avg, bill_avg, n_records = tips_metrics(*filter_key)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric('Total Bill', f'${filtered["total_bill"].sum():.0f}')
-    col2.metric('Avg Tip', f'${filtered["tip"].mean():.2f}')
-    col3.metric('Avg Bill', f'${filtered["total_bill"].mean():.2f}')
-    col4.metric('Records', len(filtered))
+    col1.metric('Total Bill', f'${bill_sum:.0f}')
+    col2.metric('Avg Tip', f'${tip_avg:.2f}')
+    col3.metric('Avg Bill', f'${bill_avg:.2f}')
+    col4.metric('Records', n_records)
     
-    # Charts
+    # Charts (cached per filter key)
+    fig_scatter, fig_box = tips_figures(*filter_key)
     col1, col2 = st.columns(2)
     with col1:
         st.subheader('Scatter: Bill vs Tip')
-        fig = px.scatter(filtered, x='total_bill', y='tip', color='time', size='size')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_scatter, use_container_width=True, key='tips_scatter')
     with col2:
         st.subheader('Box: Day vs Bill')
-        fig = px.box(filtered, x='day', y='total_bill', color='time')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_box, use_container_width=True, key='tips_box')
     
     st.subheader('Data Preview')
     st.dataframe(filtered.head(10))
@@ -75,33 +188,34 @@ elif dataset == 'Iris':
     
     # STEP 2: Sidebar Filters
     st.sidebar.subheader('Filters')
-    selected_species = st.sidebar.multiselect('Species', df['species'].unique(),
-                                              default=df['species'].unique())
-    
-    # STEP 3: Apply Filters
-    filtered = df[df['species'].isin(selected_species)]
+    options = iris_distincts()
+    selected_species = st.sidebar.multiselect('Species', options['species'],
+                                              default=options['species'])
     
+    # STEP 3: Apply Filters (cached on the widget values)
+    filter_key = (tuple(sorted(selected_species)),)
+    filtered = filter_iris(*filter_key)
+
     # STEP 4: Show Metrics
+    n_records, n_species, petal_avg, sepal_avg = iris_metrics(*filter_key)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric('Total Records', len(filtered))
-    col2.metric('Species Count', filtered['species'].nunique())
-    col3.metric('Avg Petal Length', f'{filtered["petal_length"].mean():.2f}')
-    col4.metric('Avg Sepal Width', f'{filtered["sepal_width"].mean():.2f}')
+    col1.metric('Total Records', n_records)
+    col2.metric('Species Count', n_species)
+    col3.metric('Avg Petal Length', f'{petal_avg:.2f}')
+    col4.metric('Avg Sepal Width', f'{sepal_avg:.2f}')
     
-    # Charts
+    # Charts (cached per filter key)
+    fig_scatter, fig_hist, fig_3d = iris_figures(*filter_key)
     col1, col2 = st.columns(2)
     with col1:
         st.subheader('Scatter: Petal')
-        fig = px.scatter(filtered, x='petal_length', y='petal_width', color='species', size='sepal_length')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig_scatter, use_container_width=True, key='iris_scatter')
     with col2:
         st.subheader('Histogram: Sepal Length')
-        fig = px.histogram(filtered, x='sepal_length', nbins=30, color='species')
-        st.plotly_chart(fig, use_container_width=True)
-    
+        st.plotly_chart(fig_hist, use_container_width=True, key='iris_hist')
+
     st.subheader('3D Scatter Plot')
-    fig = px.scatter_3d(filtered, x='sepal_length', y='sepal_width', z='petal_length', color='species')
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig_3d, use_container_width=True, key='iris_3d')
     
     st.subheader('Data Preview')
     st.dataframe(filtered.head(10))
@@ -115,28 +229,28 @@ elif dataset == 'Gapminder':
     
     # STEP 2: Sidebar Filters
     st.sidebar.subheader('Filters')
-    selected_year = st.sidebar.slider('Select Year', 
-                                      int(df['year'].min()), 
-                                      int(df['year'].max()))
-    selected_continent = st.sidebar.multiselect('Continent', 
-                                                df['continent'].unique(),
-                                                default=df['continent'].unique())
-    
-    # STEP 3: Apply Filters
-    filtered = df[(df['year'] == selected_year) & 
-                  (df['continent'].isin(selected_continent))]
+    options = gapminder_distincts()
+    year_min, year_max = options['year_range']
+    selected_year = st.sidebar.slider('Select Year', year_min, year_max)
+    selected_continent = st.sidebar.multiselect('Continent',
+                                                options['continent'],
+                                                default=options['continent'])
     
+    # STEP 3: Apply Filters (cached on the widget values)
+    filter_key = (selected_year, tuple(sorted(selected_continent)))
+    filtered = filter_gapminder(*filter_key)
+
     # STEP 4: Show Metrics
+    n_countries, life_avg, gdp_avg, pop_sum = gapminder_metrics(*filter_key)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric('Countries', filtered['country'].nunique())
-    col2.metric('Avg Life Exp', f'{filtered["lifeExp"].mean():.1f}')
-    col3.metric('Avg GDP', f'${filtered["gdpPercap"].mean():.0f}')
-    col4.metric('Total Pop', f'{filtered["pop"].sum()/1e9:.2f}B')
+    col1.metric('Countries', n_countries)
+    col2.metric('Avg Life Exp', f'{life_avg:.1f}')
+    col3.metric('Avg GDP', f'${gdp_avg:.0f}')
+    col4.metric('Total Pop', f'{pop_sum/1e9:.2f}B')
     
     st.subheader(f'Life Expectancy vs GDP ({selected_year})')
-    fig = px.scatter(filtered, x='gdpPercap', y='lifeExp', size='pop', color='continent',
-                     hover_name='country', log_x=True, size_max=60)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = gapminder_figure(*filter_key)
+    st.plotly_chart(fig, use_container_width=True, key='gapminder_scatter')
     
     st.subheader('Data Preview')
     st.dataframe(filtered.head(10))